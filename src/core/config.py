@@ -2,11 +2,44 @@
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 import dotenv
 
-# Load environment variables from .env file
-dotenv.load_dotenv(override=True)
+if TYPE_CHECKING:
+    import dspy
+
+# Human-readable case labels, in the order the example builders load cases
+CASE_DISPLAY_NAMES = ("Case A (ATO)", "Case B (Synthetic)", "Case C (Legitimate)")
+
+# Whether the .env file has been loaded into the environment
+_env_loaded = False
+
+
+def _ensure_env_loaded() -> None:
+    """Load environment variables from the .env file on first use."""
+    global _env_loaded
+    if not _env_loaded:
+        dotenv.load_dotenv(override=True)
+        _env_loaded = True
+
+
+# Retries (with exponential backoff, via LiteLLM) on transient provider errors such as 429s/5xx.
+# The judge retries harder: a judge call that gives up degrades the metric to its fallback score.
+NUM_RETRIES = 3
+JUDGE_NUM_RETRIES = 6
+
+
+@lru_cache(maxsize=None)
+def _get_lm(
+    model_name: str, temperature: float, cache: bool, max_tokens: Optional[int], num_retries: int = NUM_RETRIES
+) -> "dspy.LM":
+    """Get or create the language model for a given set of settings."""
+    # Imported here so loading configuration doesn't pull in DSPy
+    import dspy
+
+    kwargs = {} if max_tokens is None else {"max_tokens": max_tokens}
+    return dspy.LM(model_name, temperature=temperature, cache=cache, num_retries=num_retries, **kwargs)
 
 
 @dataclass
@@ -20,6 +53,7 @@ class InstrumentationConfig:
     @classmethod
     def from_env(cls) -> "InstrumentationConfig":
         """Create configuration from environment variables."""
+        _ensure_env_loaded()
         return cls(
             enabled=os.getenv("ENABLE_INSTRUMENTATION", "false").lower() == "true",
             phoenix_endpoint=os.getenv("PHOENIX_ENDPOINT"),
@@ -34,10 +68,20 @@ class ModelConfig:
     model_name: str = "openai/gpt-5"
     temperature: float = 1.0
     cache: bool = True
+    max_tokens: Optional[int] = None
+    num_retries: int = NUM_RETRIES
 
     @classmethod
-    def from_args(cls, model: str, temperature: float, cache: Optional[bool] = None) -> "ModelConfig":
+    def from_args(
+        cls,
+        model: str,
+        temperature: float,
+        cache: Optional[bool] = None,
+        max_tokens: Optional[int] = None,
+        num_retries: int = NUM_RETRIES,
+    ) -> "ModelConfig":
         """Create configuration from command line arguments."""
+        _ensure_env_loaded()
 
         # Handle special case for GPT-5 temperature
         if "gpt-5" in model.lower() and temperature != 1.0:
@@ -48,7 +92,9 @@ class ModelConfig:
         if cache is None:
             cache = os.getenv("DSPY_CACHE", "true").lower() == "true"
 
-        return cls(model_name=model, temperature=temperature, cache=cache)
+        return cls(
+            model_name=model, temperature=temperature, cache=cache, max_tokens=max_tokens, num_retries=num_retries
+        )
 
 
 @dataclass
@@ -57,6 +103,7 @@ class AppConfig:
 
     instrumentation: InstrumentationConfig
     model: ModelConfig
+    judge: ModelConfig
 
     @classmethod
     def create(
@@ -64,9 +111,44 @@ class AppConfig:
         model_name: str = "openai/gpt-5",
         temperature: float = 1.0,
         cache: Optional[bool] = None,
+        max_tokens: Optional[int] = None,
+        judge_model_name: str = "openai/gpt-4o-mini",
     ) -> "AppConfig":
         """Create application configuration."""
         return cls(
             instrumentation=InstrumentationConfig.from_env(),
-            model=ModelConfig.from_args(model_name, temperature, cache),
+            model=ModelConfig.from_args(model_name, temperature, cache, max_tokens),
+            # Grading needs less capability than the task, so the judge uses a cheaper, deterministic model
+            judge=ModelConfig.from_args(judge_model_name, temperature=0.0, cache=cache, num_retries=JUDGE_NUM_RETRIES),
+        )
+
+    def configure_dspy(self) -> "dspy.LM":
+        """
+        Configure DSPy with the language model for this configuration.
+
+        The LM is shared by every configuration with the same model settings, so
+        running several modules in one process reuses a single instance.
+        """
+        import dspy
+
+        # With `cache` on (DSPY_CACHE), responses are served from DSPy's in-memory and
+        # on-disk cache, so re-running the fixed eval cases is near-instant
+        lm = _get_lm(
+            self.model.model_name,
+            self.model.temperature,
+            self.model.cache,
+            self.model.max_tokens,
+            self.model.num_retries,
+        )
+        dspy.configure(lm=lm)
+        return lm
+
+    def judge_lm(self) -> "dspy.LM":
+        """Get the (shared) language model used by the LLM-as-a-judge metrics."""
+        return _get_lm(
+            self.judge.model_name,
+            self.judge.temperature,
+            self.judge.cache,
+            self.judge.max_tokens,
+            self.judge.num_retries,
         )
@@ -1,64 +1,97 @@
-import json
 import dspy
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple, TypeVar
 
+T = TypeVar("T")
 
+# Case directories, in display order (see CASE_DISPLAY_NAMES in config)
+_CASES = ("case_a", "case_b", "case_c")
+
+# Case file name -> signature field name
+_FILE_TO_KEY = {
+    "identity.json": "identity_data",
+    "accounts.json": "account_data",  # singular
+    "transactions.json": "transaction_data",  # singular
+    "device_network.json": "device_network_data",
+    "behavioral.json": "behavioral_data",
+    "link_graph.json": "link_graph_data",
+    "model_rules.json": "model_rule_signals",
+}
+
+
+def _read_case_file(file_path: Path, key: str) -> Optional[Tuple[str, str]]:
+    """Read a single case file, returning its signature field name and minified JSON content."""
+    try:
+        content = file_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+    # Re-serialize without indentation so formatting whitespace doesn't cost prompt tokens
+    return key, orjson.dumps(orjson.loads(content)).decode("utf-8")
+
+
+@lru_cache(maxsize=None)
 def load_case_data(case_name: str) -> Dict[str, str]:
-    """Load all JSON files for a case and return as string dict."""
+    """
+    Load all JSON files for a case and return as string dict.
+
+    Results are memoized per case so the example builders share a single read;
+    treat the returned dict as read-only.
+    """
     base_path = Path(f"datasets/cases/{case_name}")
-    data = {}
-
-    files = [
-        "identity.json",
-        "accounts.json",
-        "transactions.json",
-        "device_network.json",
-        "behavioral.json",
-        "link_graph.json",
-        "model_rules.json",
-    ]
-
-    for file in files:
-        file_path = base_path / file
-        if file_path.exists():
-            with open(file_path, "r") as f:
-                key = file.replace(".json", "_data")
-                # Map to signature field names
-                if key == "model_rules_data":
-                    key = "model_rule_signals"
-                elif key == "accounts_data":
-                    key = "account_data"  # singular
-                elif key == "transactions_data":
-                    key = "transaction_data"  # singular
-                data[key] = f.read()
-
-    return data
+
+    # File reads are independent and release the GIL, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=len(_FILE_TO_KEY)) as executor:
+        results = executor.map(_read_case_file, (base_path / file for file in _FILE_TO_KEY), _FILE_TO_KEY.values())
+
+    return dict(result for result in results if result is not None)
 
 
+@lru_cache(maxsize=None)
 def load_labels(case_name: str) -> Dict[str, Any]:
-    """Load ground truth labels for a case."""
+    """Load ground truth labels for a case (memoized, treat as read-only)."""
     labels_path = Path(f"datasets/labels/{case_name}_labels.json")
-    with open(labels_path, "r") as f:
-        return json.load(f)
+    return orjson.loads(labels_path.read_bytes())
 
 
+@lru_cache(maxsize=None)
 def load_analyst_note(case_name: str) -> str:
-    """Load optional analyst paragraph for a case."""
+    """Load optional analyst paragraph for a case (memoized)."""
     note_path = Path(f"datasets/analyst_notes/{case_name}_note.txt")
-    if note_path.exists():
-        with open(note_path, "r") as f:
-            return f.read().strip()
-    return ""
+    try:
+        return note_path.read_text().strip()
+    except FileNotFoundError:
+        return ""
 
 
+def example_inputs(example: dspy.Example) -> Dict[str, Any]:
+    """
+    Return an example's input fields as keyword arguments.
+
+    `Example.inputs()` re-filters the whole example on every call, so the result
+    is computed once and kept on the (cached) example.
+    """
+    try:
+        return example._input_kwargs
+    except AttributeError:
+        example._input_kwargs = example.inputs().toDict()
+        return example._input_kwargs
+
+
+def _map_cases(loader: Callable[[str], T], cases: Tuple[str, ...]) -> List[T]:
+    """Run a per-case loader concurrently, preserving case order."""
+    with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+        return list(executor.map(loader, cases))
+
+
+@lru_cache(maxsize=1)
 def create_hypothesis_examples() -> List[dspy.Example]:
-    """Create DSPy Examples for hypothesis generation task."""
+    """Create DSPy Examples for hypothesis generation task (built once, shared across callers)."""
     examples = []
-    cases = ["case_a", "case_b", "case_c"]
-
-    for case in cases:
-        case_data = load_case_data(case)
+    for case, case_data in zip(_CASES, _map_cases(load_case_data, _CASES)):
         labels = load_labels(case)
 
         # Create Example with inputs and expected outputs
@@ -82,13 +115,11 @@ def create_hypothesis_examples() -> List[dspy.Example]:
     return examples
 
 
+@lru_cache(maxsize=1)
 def create_contradiction_examples() -> List[dspy.Example]:
-    """Create DSPy Examples for contradiction checking task."""
+    """Create DSPy Examples for contradiction checking task (built once, shared across callers)."""
     examples = []
-    cases = ["case_a", "case_b", "case_c"]
-
-    for case in cases:
-        case_data = load_case_data(case)
+    for case, case_data in zip(_CASES, _map_cases(load_case_data, _CASES)):
         labels = load_labels(case)
 
         example = dspy.Example(
@@ -110,13 +141,11 @@ def create_contradiction_examples() -> List[dspy.Example]:
     return examples
 
 
+@lru_cache(maxsize=1)
 def create_narrative_examples() -> List[dspy.Example]:
-    """Create DSPy Examples for narrative drafting task."""
+    """Create DSPy Examples for narrative drafting task (built once, shared across callers)."""
     examples = []
-    cases = ["case_a", "case_b", "case_c"]
-
-    for case in cases:
-        case_data = load_case_data(case)
+    for case, case_data in zip(_CASES, _map_cases(load_case_data, _CASES)):
         labels = load_labels(case)
         analyst_note = load_analyst_note(case)
 
@@ -0,0 +1,19 @@
+"""Shared evaluation helpers for fraud intelligence modules."""
+
+import os
+import dspy
+from dspy.evaluate import Evaluate
+from typing import Callable, List
+
+# Default worker count, resolved once per process
+NUM_THREADS = os.cpu_count() or 1
+
+
+def create_evaluator(devset: List[dspy.Example], metric: Callable, num_threads: int = NUM_THREADS) -> Evaluate:
+    """Create the evaluator for a devset/metric pair (construction does no work, so nothing is cached)."""
+    return Evaluate(
+        devset=devset,
+        metric=metric,
+        num_threads=num_threads,
+        display_progress=True,
+    )
@@ -2,14 +2,9 @@
 
 from typing import Optional
 from .config import InstrumentationConfig
-from openinference.instrumentation.dspy import DSPyInstrumentor
-from openinference.instrumentation.litellm import LiteLLMInstrumentor
-from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from openinference.semconv.resource import ResourceAttributes
-from opentelemetry.sdk.resources import Resource
+
+# Whether instrumentation has already been installed in this process
+_instrumented = False
 
 
 def configure_dspy_instrumentation(
@@ -18,14 +13,33 @@ def configure_dspy_instrumentation(
     """
     Configure OpenTelemetry instrumentation for DSPy fraud analysis.
 
+    Safe to call more than once: later calls are no-ops, so exporters and
+    instrumentors are installed only once per process.
+
     Args:
         phoenix_endpoint: Phoenix/OTLP endpoint URL (e.g., "http://localhost:6006/v1/traces")
         project_name: Project name for trace attribution
     """
-    # Create tracer provider
-    resource = Resource(attributes={ResourceAttributes.PROJECT_NAME: project_name})
-    tracer_provider = TracerProvider(resource=resource)
-    trace.set_tracer_provider(tracer_provider)
+    global _instrumented
+    if _instrumented:
+        return
+
+    # Imported here so runs without instrumentation skip the OpenTelemetry/gRPC import cost
+    from openinference.instrumentation.dspy import DSPyInstrumentor
+    from openinference.instrumentation.litellm import LiteLLMInstrumentor
+    from opentelemetry import trace
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from openinference.semconv.resource import ResourceAttributes
+    from opentelemetry.sdk.resources import Resource
+
+    # Reuse an SDK tracer provider if one is already installed, otherwise create one
+    tracer_provider = trace.get_tracer_provider()
+    if not isinstance(tracer_provider, TracerProvider):
+        resource = Resource(attributes={ResourceAttributes.PROJECT_NAME: project_name})
+        tracer_provider = TracerProvider(resource=resource)
+        trace.set_tracer_provider(tracer_provider)
 
     # Configure OTLP exporter if endpoint provided
     if phoenix_endpoint:
@@ -46,6 +60,8 @@ def configure_dspy_instrumentation(
     LiteLLMInstrumentor().instrument(tracer_provider=tracer_provider, skip_dep_check=True)
     print("✓ LiteLLM instrumentation enabled")
 
+    _instrumented = True
+
 
 def setup_instrumentation_from_env() -> bool:
     """
@@ -0,0 +1,9 @@
+"""Console output helpers for fraud intelligence modules."""
+
+import sys
+from typing import List
+
+
+def emit(lines: List[str]) -> None:
+    """Write a block of output lines with a single write call."""
+    sys.stdout.write("\n".join(lines) + "\n")
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 
 import argparse
-import os
+import logging
+import threading
 import dspy
-from dspy.evaluate import Evaluate
 from typing import List
-from src.core.data_loader import create_contradiction_examples
-from src.core.config import AppConfig
+from src.core.data_loader import create_contradiction_examples, example_inputs
+from src.core.config import CASE_DISPLAY_NAMES, AppConfig
+from src.core.evaluation import NUM_THREADS, create_evaluator
 from src.core.instrumentation import setup_instrumentation_from_env
+from src.core.output import emit
+
+logger = logging.getLogger(__name__)
 
 
 class ContradictionCheckSignature(dspy.Signature):
@@ -55,15 +59,18 @@ class ContradictionJudgeSignature(dspy.Signature):
     )
 
 
-# Global judge instance
+# Global judge instance (metrics run on Evaluate's worker threads, so creation is locked)
 _contradiction_judge = None
+_contradiction_judge_lock = threading.Lock()
 
 
 def get_contradiction_judge():
     """Get or create the contradiction judge instance."""
     global _contradiction_judge
     if _contradiction_judge is None:
-        _contradiction_judge = dspy.ChainOfThought(ContradictionJudgeSignature)
+        with _contradiction_judge_lock:
+            if _contradiction_judge is None:
+                _contradiction_judge = dspy.ChainOfThought(ContradictionJudgeSignature)
     return _contradiction_judge
 
 
@@ -84,7 +91,7 @@ def contradiction_metric(example: dspy.Example, pred: dspy.Prediction, trace=Non
         )
 
         # Combine contradiction and missing info quality
-        final_score = judgment.contradiction_quality * 0.5 + judgment.missing_info_quality * 0.5
+        final_score = 0.5 * (judgment.contradiction_quality + judgment.missing_info_quality)
 
         # For compilation mode, return boolean
         if trace is not None:
@@ -93,100 +100,93 @@ def contradiction_metric(example: dspy.Example, pred: dspy.Prediction, trace=Non
         return final_score
 
     except Exception as e:
-        print(f"▸ Judge evaluation failed: {e}")
+        logger.warning("Judge evaluation failed: %s", e)
         # Fallback to simple metric
-        has_output = bool(
-            (pred.contradictions and len(pred.contradictions) > 0)
-            or (pred.missing_info_requests and len(pred.missing_info_requests) > 0)
-        )
+        has_output = bool(pred.contradictions or pred.missing_info_requests)
         return 0.5 if has_output else 0.0
 
 
 def run_demo(checker: ContradictionChecker, examples: List[dspy.Example]):
     """Run demo on a single example."""
-    print("\n" + "=" * 70)
-    print("CONTRADICTION & MISSING INFO CHECKER - DEMO MODE")
-    print("=" * 70)
-
     # Use the first example for demo
     example = examples[0]
 
-    print("\n▹ Processing Case A (Account Takeover)...")
-    print("-" * 40)
+    emit(
+        [
+            "\n" + "=" * 70,
+            "CONTRADICTION & MISSING INFO CHECKER - DEMO MODE",
+            "=" * 70,
+            "\n▹ Processing Case A (Account Takeover)...",
+            "-" * 40,
+        ]
+    )
 
     # Generate prediction (DSPy instrumentation auto-traces this)
-    pred = checker(**example.inputs())
+    pred = checker(**example_inputs(example))
 
     # Display results
-    contradictions = pred.contradictions or []
-    missing_info = pred.missing_info_requests or []
+    contradictions = pred.contradictions
+    missing_info = pred.missing_info_requests
 
-    print("\n▸ Contradictions Found:")
+    lines = ["\n▸ Contradictions Found:"]
     if contradictions:
-        for i, cont in enumerate(contradictions, 1):
-            print(f"   {i}. {cont}")
+        lines.extend(f"   {i}. {cont}" for i, cont in enumerate(contradictions, 1))
     else:
-        print("   None detected")
+        lines.append("   None detected")
 
-    print("\n▹ Missing Information Requests:")
+    lines.append("\n▹ Missing Information Requests:")
     if missing_info:
-        for i, req in enumerate(missing_info[:3], 1):
-            print(f"   {i}. {req}")
+        lines.extend(f"   {i}. {req}" for i, req in enumerate(missing_info[:3], 1))
     else:
-        print("   None identified")
+        lines.append("   None identified")
 
-    print("\n✓ Expected Output:")
+    lines.append("\n✓ Expected Output:")
     if example.missing_info_requests:
-        print("   Missing Info Requests:")
-        for i, req in enumerate(example.missing_info_requests, 1):
-            print(f"     {i}. {req}")
+        lines.append("   Missing Info Requests:")
+        lines.extend(f"     {i}. {req}" for i, req in enumerate(example.missing_info_requests, 1))
+    emit(lines)
 
     # Calculate metric
     score = contradiction_metric(example, pred)
-    print(f"\n▹ Metric Score: {score:.3f}")
+    emit([f"\n▹ Metric Score: {score:.3f}"])
 
 
-def run_evaluation(checker: ContradictionChecker, examples: List[dspy.Example]):
+def run_evaluation(checker: ContradictionChecker, examples: List[dspy.Example], num_threads: int = NUM_THREADS):
     """Run full evaluation on all examples."""
-    print("\n" + "=" * 70)
-    print("CONTRADICTION & MISSING INFO CHECKER - EVALUATION MODE")
-    print("=" * 70)
-
     # Split data
     trainset = examples[:2]
     devset = examples
 
-    print("\n▸ Dataset Statistics:")
-    print(f"   • Training examples: {len(trainset)}")
-    print(f"   • Evaluation examples: {len(devset)}")
+    emit(
+        [
+            "\n" + "=" * 70,
+            "CONTRADICTION & MISSING INFO CHECKER - EVALUATION MODE",
+            "=" * 70,
+            "\n▸ Dataset Statistics:",
+            f"   • Training examples: {len(trainset)}",
+            f"   • Evaluation examples: {len(devset)}",
+            "\n▸ Running evaluation...",
+        ]
+    )
 
     # Set up evaluator
-    evaluator = Evaluate(
-        devset=devset,
-        metric=contradiction_metric,
-        num_threads=os.cpu_count() or 1,
-        display_progress=True,
-    )
+    evaluator = create_evaluator(devset, contradiction_metric, num_threads)
 
     # Run evaluation (DSPy instrumentation auto-traces this)
-    print("\n▸ Running evaluation...")
-    results = evaluator(checker)
+    results, outputs = evaluator(checker, return_outputs=True)
 
-    print(f"\n▹ Final Score: {results:.3f}")
-
-    # Detailed metrics
-    print("\n- Detailed Analysis:")
+    # Detailed metrics (reuses the per-example scores from the evaluation pass)
+    lines = [f"\n▹ Final Score: {results:.3f}", "\n- Detailed Analysis:"]
     total_score = 0
-    for i, example in enumerate(devset):
-        pred = checker(**example.inputs())
-        score = contradiction_metric(example, pred)
+    for i, (_, _, score) in enumerate(outputs):
         total_score += score
 
-        case_name = ["Case A (ATO)", "Case B (Synthetic)", "Case C (Legitimate)"][i]
-        print(f"   • {case_name}: {score:.3f}")
+        case_name = CASE_DISPLAY_NAMES[i]
+        lines.append(f"   • {case_name}: {score:.3f}")
 
     avg_score = total_score / len(devset)
-    print(f"\n   Average Score: {avg_score:.3f}")
+    lines.append(f"\n   Average Score: {avg_score:.3f}")
+    emit(lines)
 
 
 def main():
@@ -202,6 +202,17 @@ def main():
         default="openai/gpt-5-2025-08-07",
         help="Language model to use (default: openai/gpt-5-2025-08-07)",
     )
+    parser.add_argument(
+        "--judge-model",
+        default="openai/gpt-4o-mini",
+        help="Language model for the LLM-as-a-judge metric (default: openai/gpt-4o-mini)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=NUM_THREADS,
+        help=f"Number of threads evaluating examples in eval mode (default: CPU count, {NUM_THREADS})",
+    )
 
     args = parser.parse_args()
 
@@ -209,17 +220,12 @@ def main():
     setup_instrumentation_from_env()
 
     # Create configuration
-    config = AppConfig.create(args.model, temperature=1.0)
+    config = AppConfig.create(args.model, temperature=1.0, max_tokens=16000, judge_model_name=args.judge_model)
 
     # Configure DSPy
-    print(f"▸ Configuring DSPy with {config.model.model_name}...")
-    lm = dspy.LM(
-        config.model.model_name,
-        temperature=config.model.temperature,
-        cache=config.model.cache,
-        max_tokens=16000,
-    )
-    dspy.configure(lm=lm)
+    print(f"▸ Configuring DSPy with {config.model.model_name} (judge: {config.judge.model_name})...")
+    config.configure_dspy()
+    get_contradiction_judge().set_lm(config.judge_lm())
 
     # Load data
     print("▸ Loading dataset...")
@@ -232,7 +238,7 @@ def main():
     if args.mode == "demo":
         run_demo(checker, examples)
     else:
-        run_evaluation(checker, examples)
+        run_evaluation(checker, examples, num_threads=args.concurrency)
 
     print("\n✓ Complete!\n")
 
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 
 import argparse
-import os
+import logging
+import threading
 import dspy
-from dspy.evaluate import Evaluate
 from typing import List
-from src.core.data_loader import create_hypothesis_examples
-from src.core.config import AppConfig
+from src.core.data_loader import create_hypothesis_examples, example_inputs
+from src.core.config import CASE_DISPLAY_NAMES, AppConfig
+from src.core.evaluation import NUM_THREADS, create_evaluator
 from src.core.instrumentation import setup_instrumentation_from_env
+from src.core.output import emit
+
+logger = logging.getLogger(__name__)
 
 
 class HypothesisGeneratorSignature(dspy.Signature):
@@ -57,15 +61,18 @@ class HypothesisJudgeSignature(dspy.Signature):
     )
 
 
-# Global judge instance
+# Global judge instance (metrics run on Evaluate's worker threads, so creation is locked)
 _hypothesis_judge = None
+_hypothesis_judge_lock = threading.Lock()
 
 
 def get_hypothesis_judge():
     """Get or create the hypothesis judge instance."""
     global _hypothesis_judge
     if _hypothesis_judge is None:
-        _hypothesis_judge = dspy.ChainOfThought(HypothesisJudgeSignature)
+        with _hypothesis_judge_lock:
+            if _hypothesis_judge is None:
+                _hypothesis_judge = dspy.ChainOfThought(HypothesisJudgeSignature)
     return _hypothesis_judge
 
 
@@ -95,95 +102,88 @@ def hypothesis_metric(example: dspy.Example, pred: dspy.Prediction, trace=None)
         return final_score
 
     except Exception as e:
-        print(f"▸ Judge evaluation failed: {e}")
+        logger.warning("Judge evaluation failed: %s", e)
         # Fallback to simple metric
-        pred_has_content = bool(
-            pred.hypotheses
-            and len(pred.hypotheses) > 0
-            and pred.supporting_evidence
-            and len(pred.supporting_evidence) > 0
-        )
+        pred_has_content = bool(pred.hypotheses and pred.supporting_evidence)
         return 0.5 if pred_has_content else 0.0
 
 
 def run_demo(generator: HypothesisGenerator, examples: List[dspy.Example]):
     """Run demo on a single example."""
-    print("\n" + "=" * 70)
-    print("HYPOTHESIS GENERATOR - DEMO MODE")
-    print("=" * 70)
-
     # Use the first example for demo
     example = examples[0]
 
-    print("\n▹ Processing Case A (Account Takeover)...")
-    print("-" * 40)
+    emit(
+        [
+            "\n" + "=" * 70,
+            "HYPOTHESIS GENERATOR - DEMO MODE",
+            "=" * 70,
+            "\n▹ Processing Case A (Account Takeover)...",
+            "-" * 40,
+        ]
+    )
 
     # Generate prediction (DSPy instrumentation auto-traces this)
-    pred = generator(**example.inputs())
+    pred = generator(**example_inputs(example))
 
     # Display results
     hypotheses = pred.hypotheses
     evidence = pred.supporting_evidence
     scores = pred.confidence_scores
 
-    print("\n- Generated Hypotheses:")
-    for i, (hyp, score) in enumerate(zip(hypotheses[:3], scores[:3]), 1):
-        print(f"   {i}. {hyp} (confidence: {score:.2f})")
+    lines = ["\n- Generated Hypotheses:"]
+    lines.extend(
+        f"   {i}. {hyp} (confidence: {score:.2f})" for i, (hyp, score) in enumerate(zip(hypotheses[:3], scores[:3]), 1)
+    )
 
-    print("\n- Supporting Evidence (sample):")
-    for i, ev in enumerate(evidence[:3], 1):
-        print(f"   • {ev[:80]}...")
+    lines.append("\n- Supporting Evidence (sample):")
+    lines.extend(f"   • {ev[:80]}..." for ev in evidence[:3])
 
-    print("\n✓ Expected Output:")
-    for i, hyp in enumerate(example.hypotheses[:3], 1):
-        print(f"   {i}. {hyp}")
+    lines.append("\n✓ Expected Output:")
+    lines.extend(f"   {i}. {hyp}" for i, hyp in enumerate(example.hypotheses[:3], 1))
+    emit(lines)
 
     # Calculate metric
     score = hypothesis_metric(example, pred)
-    print(f"\n▹ Metric Score: {score:.3f}")
+    emit([f"\n▹ Metric Score: {score:.3f}"])
 
 
-def run_evaluation(generator: HypothesisGenerator, examples: List[dspy.Example]):
+def run_evaluation(generator: HypothesisGenerator, examples: List[dspy.Example], num_threads: int = NUM_THREADS):
     """Run full evaluation on all examples."""
-    print("\n" + "=" * 70)
-    print("HYPOTHESIS GENERATOR - EVALUATION MODE")
-    print("=" * 70)
-
     # Split data (in practice, you'd have separate train/dev/test sets)
     trainset = examples[:2]
     devset = examples
 
-    print("\n▸ Dataset Statistics:")
-    print(f"   • Training examples: {len(trainset)}")
-    print(f"   • Evaluation examples: {len(devset)}")
+    emit(
+        [
+            "\n" + "=" * 70,
+            "HYPOTHESIS GENERATOR - EVALUATION MODE",
+            "=" * 70,
+            "\n▸ Dataset Statistics:",
+            f"   • Training examples: {len(trainset)}",
+            f"   • Evaluation examples: {len(devset)}",
+            "\n▸ Running evaluation...",
+        ]
+    )
 
     # Set up evaluator
-    evaluator = Evaluate(
-        devset=devset,
-        metric=hypothesis_metric,
-        num_threads=os.cpu_count() or 1,
-        display_progress=True,
-    )
+    evaluator = create_evaluator(devset, hypothesis_metric, num_threads)
 
     # Run evaluation (DSPy instrumentation auto-traces this)
-    print("\n▸ Running evaluation...")
-    results = evaluator(generator)
-
-    print(f"\n▹ Final Score: {results:.3f}")
+    results, outputs = evaluator(generator, return_outputs=True)
 
-    # Detailed metrics
-    print("\n- Detailed Analysis:")
+    # Detailed metrics (reuses the per-example scores from the evaluation pass)
+    lines = [f"\n▹ Final Score: {results:.3f}", "\n- Detailed Analysis:"]
     total_score = 0
-    for i, example in enumerate(devset):
-        pred = generator(**example.inputs())
-        score = hypothesis_metric(example, pred)
+    for i, (_, _, score) in enumerate(outputs):
         total_score += score
 
-        case_name = ["Case A (ATO)", "Case B (Synthetic)", "Case C (Legitimate)"][i]
-        print(f"   • {case_name}: {score:.3f}")
+        case_name = CASE_DISPLAY_NAMES[i]
+        lines.append(f"   • {case_name}: {score:.3f}")
 
     avg_score = total_score / len(devset)
-    print(f"\n   Average Score: {avg_score:.3f}")
+    lines.append(f"\n   Average Score: {avg_score:.3f}")
+    emit(lines)
 
 
 def main():
@@ -199,6 +199,17 @@ def main():
         default="openai/gpt-5-2025-08-07",
         help="Language model to use (default: openai/gpt-5-2025-08-07)",
     )
+    parser.add_argument(
+        "--judge-model",
+        default="openai/gpt-4o-mini",
+        help="Language model for the LLM-as-a-judge metric (default: openai/gpt-4o-mini)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=NUM_THREADS,
+        help=f"Number of threads evaluating examples in eval mode (default: CPU count, {NUM_THREADS})",
+    )
 
     args = parser.parse_args()
 
@@ -206,16 +217,12 @@ def main():
     setup_instrumentation_from_env()
 
     # Create configuration
-    config = AppConfig.create(args.model, temperature=1.0)
+    config = AppConfig.create(args.model, temperature=1.0, judge_model_name=args.judge_model)
 
     # Configure DSPy
-    print(f"▸ Configuring DSPy with {config.model.model_name}...")
-    lm = dspy.LM(
-        config.model.model_name,
-        temperature=config.model.temperature,
-        cache=config.model.cache,
-    )
-    dspy.configure(lm=lm)
+    print(f"▸ Configuring DSPy with {config.model.model_name} (judge: {config.judge.model_name})...")
+    config.configure_dspy()
+    get_hypothesis_judge().set_lm(config.judge_lm())
 
     # Load data
     print("▸ Loading dataset...")
@@ -228,7 +235,7 @@ def main():
     if args.mode == "demo":
         run_demo(generator, examples)
     else:
-        run_evaluation(generator, examples)
+        run_evaluation(generator, examples, num_threads=args.concurrency)
 
     print("\n✓ Complete!\n")
 
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 
 import argparse
-import os
+import logging
+import threading
 import dspy
-from dspy.evaluate import Evaluate
-from typing import List
-from src.core.data_loader import create_narrative_examples
-from src.core.config import AppConfig
+from typing import List, Optional
+from src.core.data_loader import create_narrative_examples, example_inputs
+from src.core.config import CASE_DISPLAY_NAMES, AppConfig
+from src.core.evaluation import NUM_THREADS, create_evaluator
 from src.core.instrumentation import setup_instrumentation_from_env
+from src.core.output import emit
+
+logger = logging.getLogger(__name__)
 
 
 class NarrativeDrafterSignature(dspy.Signature):
@@ -26,22 +30,36 @@ class NarrativeDrafterSignature(dspy.Signature):
     headline: str = dspy.OutputField(desc="One-line summary of the case")
 
 
+# Routes every drafter call to the same OpenAI prompt cache, so the shared
+# signature/demos prefix is reused and only the per-case JSON is processed
+PROMPT_CACHE_KEY = "narrative_drafter"
+
+
+def _draft_config(lm: Optional[dspy.LM]) -> dict:
+    """LM kwargs for drafter calls on `lm` (prompt-cache routing on OpenAI models)."""
+    if lm is not None and lm.model.startswith("openai/"):
+        return {"extra_body": {"prompt_cache_key": PROMPT_CACHE_KEY}}
+    return {}
+
+
 class NarrativeDrafter(dspy.Module):
     def __init__(self):
         super().__init__()
         self.draft = dspy.ChainOfThought(NarrativeDrafterSignature)
 
     def forward(self, **kwargs):
-        result = self.draft(**kwargs)
+        # The drafter's own LM (set_lm lands on the inner Predict) takes precedence over the global one
+        lm = self.draft.predict.lm or dspy.settings.lm
+        result = self.draft(config=_draft_config(lm), **kwargs)
 
-        return dspy.Prediction(
-            draft_narrative=result.draft_narrative.strip(),
-            headline=result.headline.strip(),
-        )
+        # Strip in place (a no-op copy-wise when the adapter already stripped them)
+        result.draft_narrative = result.draft_narrative.strip()
+        result.headline = result.headline.strip()
+        return result
 
 
 class NarrativeJudgeSignature(dspy.Signature):
-    """Judge the quality of fraud narrative and headline generation."""
+    """Judge the quality of fraud narrative and headline generation. Output only the three scores, no explanation."""
 
     predicted_narrative: str = dspy.InputField(desc="Generated fraud analysis narrative")
     gold_narrative: str = dspy.InputField(desc="Expected fraud analysis narrative")
@@ -55,36 +73,82 @@ class NarrativeJudgeSignature(dspy.Signature):
     conciseness: float = dspy.OutputField(desc="Score 0.0-1.0 evaluating appropriate length and brevity")
 
 
-# Global judge instance
+# Global judge instance (metrics run on Evaluate's worker threads, so creation is locked)
 _narrative_judge = None
+_narrative_judge_lock = threading.Lock()
 
 
 def get_narrative_judge():
     """Get or create the narrative judge instance."""
     global _narrative_judge
     if _narrative_judge is None:
-        _narrative_judge = dspy.ChainOfThought(NarrativeJudgeSignature)
+        with _narrative_judge_lock:
+            if _narrative_judge is None:
+                # Plain Predict: the metric only reads the scores, so a rationale is wasted output tokens
+                _narrative_judge = dspy.Predict(NarrativeJudgeSignature)
     return _narrative_judge
 
 
+def _word_count(text: str) -> int:
+    """Count whitespace-separated words (str.split is the fastest way to do this in CPython)."""
+    return len(text.split())
+
+
+def _token_similarity(predicted: str, gold: str) -> float:
+    """Jaccard similarity of the lowercased word sets of two texts."""
+    predicted_tokens = set(predicted.lower().split())
+    gold_tokens = set(gold.lower().split())
+    if not predicted_tokens or not gold_tokens:
+        return 0.0
+    return len(predicted_tokens & gold_tokens) / len(predicted_tokens | gold_tokens)
+
+
+def _lexical_score(example: dspy.Example, pred: dspy.Prediction) -> Optional[float]:
+    """
+    Score the easy cases without the judge: empty output, or a near-verbatim match of gold.
+    Returns None when the pair needs the LLM judge.
+    """
+    if not pred.draft_narrative and not pred.headline:
+        return 0.0
+
+    # Word counts within 10% of each other, and near-identical vocabulary
+    predicted_words = _word_count(pred.draft_narrative)
+    gold_words = _word_count(example.draft_narrative)
+    if min(predicted_words, gold_words) < 0.9 * max(predicted_words, gold_words):
+        return None
+    if (
+        _token_similarity(pred.draft_narrative, example.draft_narrative) >= 0.95
+        and _token_similarity(pred.headline, example.headline) >= 0.9
+    ):
+        return 0.95
+
+    return None
+
+
 def narrative_metric(example: dspy.Example, pred: dspy.Prediction, trace=None) -> float:
     """
     Evaluate narrative quality using LLM-as-a-judge.
-    Uses semantic evaluation instead of keyword matching.
+    Uses semantic evaluation instead of keyword matching; a lexical gate
+    settles empty and near-verbatim outputs without calling the judge.
     """
     try:
-        judge = get_narrative_judge()
+        final_score = _lexical_score(example, pred)
+
+        if final_score is None:
+            judge = get_narrative_judge()
 
-        # Call the judge
-        judgment = judge(
-            predicted_narrative=pred.draft_narrative,
-            gold_narrative=example.draft_narrative,
-            predicted_headline=pred.headline,
-            gold_headline=example.headline,
-        )
+            # Call the judge (with DSPY_CACHE on, repeated pairs hit the judge LM's response cache)
+            judgment = judge(
+                predicted_narrative=pred.draft_narrative,
+                gold_narrative=example.draft_narrative,
+                predicted_headline=pred.headline,
+                gold_headline=example.headline,
+            )
 
-        # Combine narrative, headline, and conciseness quality
-        final_score = judgment.narrative_quality * 0.5 + judgment.headline_quality * 0.3 + judgment.conciseness * 0.2
+            # Combine narrative, headline, and conciseness quality
+            final_score = (
+                judgment.narrative_quality * 0.5 + judgment.headline_quality * 0.3 + judgment.conciseness * 0.2
+            )
 
         # For compilation mode, return boolean
         if trace is not None:
@@ -93,7 +157,7 @@ def narrative_metric(example: dspy.Example, pred: dspy.Prediction, trace=None) -
         return final_score
 
     except Exception as e:
-        print(f"▸ Judge evaluation failed: {e}")
+        logger.warning("Judge evaluation failed: %s", e)
         # Fallback to simple metric
         has_content = bool(pred.draft_narrative.strip() and pred.headline.strip())
         return 0.5 if has_content else 0.0
@@ -101,83 +165,80 @@ def narrative_metric(example: dspy.Example, pred: dspy.Prediction, trace=None) -
 
 def run_demo(drafter: NarrativeDrafter, examples: List[dspy.Example]):
     """Run demo on a single example."""
-    print("\n" + "=" * 70)
-    print("NARRATIVE DRAFTER - DEMO MODE")
-    print("=" * 70)
-
     # Use the first example for demo
     example = examples[0]
 
-    print("\n▹ Processing Case A (Account Takeover)...")
-    print("-" * 40)
+    emit(
+        [
+            "\n" + "=" * 70,
+            "NARRATIVE DRAFTER - DEMO MODE",
+            "=" * 70,
+            "\n▹ Processing Case A (Account Takeover)...",
+            "-" * 40,
+        ]
+    )
 
     # Generate prediction
-    pred = drafter(**example.inputs())
-
-    print("\n▹ Generated Headline:")
-    print(f"   {pred.headline}")
-
-    print("\n- Generated Narrative:")
-    # Format narrative for display
-    narrative_lines = pred.draft_narrative.split(". ")
-    for line in narrative_lines[:5]:  # Show first 5 sentences
-        if line:
-            print(f"   {line}.")
-
-    print("\n▹ Statistics:")
-    print(f"   • Narrative length: {len(pred.draft_narrative.split())} words")
-    print(f"   • Headline length: {len(pred.headline.split())} words")
-
-    print("\n✓ Expected Headline:")
-    print(f"   {example.headline}")
+    pred = drafter(**example_inputs(example))
+
+    lines = ["\n▹ Generated Headline:", f"   {pred.headline}", "\n- Generated Narrative:"]
+    # Format narrative for display (first 5 sentences)
+    lines.extend(f"   {line}." for line in pred.draft_narrative.split(". ")[:5] if line)
+
+    lines.extend(
+        [
+            "\n▹ Statistics:",
+            f"   • Narrative length: {_word_count(pred.draft_narrative)} words",
+            f"   • Headline length: {_word_count(pred.headline)} words",
+            "\n✓ Expected Headline:",
+            f"   {example.headline}",
+        ]
+    )
+    emit(lines)
 
     # Calculate metric
     score = narrative_metric(example, pred)
-    print(f"\n▹ Metric Score: {score:.3f}")
+    emit([f"\n▹ Metric Score: {score:.3f}"])
 
 
-def run_evaluation(drafter: NarrativeDrafter, examples: List[dspy.Example]):
+def run_evaluation(drafter: NarrativeDrafter, examples: List[dspy.Example], num_threads: int = NUM_THREADS):
     """Run full evaluation on all examples."""
-    print("\n" + "=" * 70)
-    print("NARRATIVE DRAFTER - EVALUATION MODE")
-    print("=" * 70)
-
     # Split data
     trainset = examples[:2]
     devset = examples
 
-    print("\n▸ Dataset Statistics:")
-    print(f"   • Training examples: {len(trainset)}")
-    print(f"   • Evaluation examples: {len(devset)}")
-
-    # Set up evaluator
-    evaluator = Evaluate(
-        devset=devset,
-        metric=narrative_metric,
-        num_threads=os.cpu_count() or 1,
-        display_progress=True,
+    emit(
+        [
+            "\n" + "=" * 70,
+            "NARRATIVE DRAFTER - EVALUATION MODE",
+            "=" * 70,
+            "\n▸ Dataset Statistics:",
+            f"   • Training examples: {len(trainset)}",
+            f"   • Evaluation examples: {len(devset)}",
+            "\n▸ Running evaluation...",
+        ]
     )
 
-    # Run evaluation
-    print("\n▸ Running evaluation...")
-    results = evaluator(drafter)
+    # Set up evaluator
+    evaluator = create_evaluator(devset, narrative_metric, num_threads)
 
-    print(f"\n▹ Final Score: {results:.3f}")
+    # Run evaluation (drafts each example once; outputs feed the analysis below)
+    results, outputs = evaluator(drafter, return_outputs=True)
 
-    # Detailed metrics
-    print("\n- Detailed Analysis:")
+    # Detailed metrics (reuses the per-example predictions and scores)
+    lines = [f"\n▹ Final Score: {results:.3f}", "\n- Detailed Analysis:"]
     total_score = 0
-    for i, example in enumerate(devset):
-        pred = drafter(**example.inputs())
-        score = narrative_metric(example, pred)
+    for i, (_, pred, score) in enumerate(outputs):
         total_score += score
 
-        case_name = ["Case A (ATO)", "Case B (Synthetic)", "Case C (Legitimate)"][i]
-        word_count = len(pred.draft_narrative.split())
-        print(f"   • {case_name}: {score:.3f} ({word_count} words)")
+        case_name = CASE_DISPLAY_NAMES[i]
+        # Failed examples come back as an empty prediction
+        word_count = _word_count(pred.get("draft_narrative", ""))
+        lines.append(f"   • {case_name}: {score:.3f} ({word_count} words)")
 
     avg_score = total_score / len(devset)
-    print(f"\n   Average Score: {avg_score:.3f}")
+    lines.append(f"\n   Average Score: {avg_score:.3f}")
+    emit(lines)
 
 
 def main():
@@ -193,6 +254,17 @@ def main():
         default="openai/gpt-5-2025-08-07",
         help="Language model to use (default: openai/gpt-5-2025-08-07)",
     )
+    parser.add_argument(
+        "--judge-model",
+        default="openai/gpt-4o-mini",
+        help="Language model for the LLM-as-a-judge metric (default: openai/gpt-4o-mini)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=NUM_THREADS,
+        help=f"Number of threads evaluating examples in eval mode (default: CPU count, {NUM_THREADS})",
+    )
 
     args = parser.parse_args()
 
@@ -200,16 +272,12 @@ def main():
     setup_instrumentation_from_env()
 
     # Create configuration
-    config = AppConfig.create(args.model, temperature=1.0)
+    config = AppConfig.create(args.model, temperature=1.0, judge_model_name=args.judge_model)
 
     # Configure DSPy
-    print(f"▸ Configuring DSPy with {config.model.model_name}...")
-    lm = dspy.LM(
-        config.model.model_name,
-        temperature=config.model.temperature,
-        cache=config.model.cache,
-    )
-    dspy.configure(lm=lm)
+    print(f"▸ Configuring DSPy with {config.model.model_name} (judge: {config.judge.model_name})...")
+    config.configure_dspy()
+    get_narrative_judge().set_lm(config.judge_lm())
 
     # Load data
     print("▸ Loading dataset...")
@@ -222,7 +290,7 @@ def main():
     if args.mode == "demo":
         run_demo(drafter, examples)
     else:
-        run_evaluation(drafter, examples)
+        run_evaluation(drafter, examples, num_threads=args.concurrency)
 
     print("\n✓ Complete!\n")
 